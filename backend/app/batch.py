@@ -0,0 +1,329 @@
+"""Przetwarzanie wsadowe: wiele klipów, wspólne style napisów.
+
+Etapy (extract -> transcribe -> render) są potokowane: każdy klip przechodzi
+przez etapy po kolei, ale każdy etap ma własny limit współbieżności, więc
+ekstrakcja audio i transkrypcja klipu N+1 nakładają się na renderowanie klipu N.
+
+Stan zapisywany jest w manifeście JSON po każdym etapie, co pozwala wznowić
+przerwaną partię - etapy ukończone (z istniejącym plikiem wynikowym) są pomijane.
+
+Użycie CLI (z katalogu backend):
+    python -m app.batch klipy/ inne.mp4 --output-dir wyniki --styles styles.json
+"""
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+from app.transcription import transcribe_audio, prepare_audio, generate_srt
+from app.rendering import render_full_video
+
+logger = logging.getLogger(__name__)
+
+# Dozwolone formaty wideo (jak w app.main)
+ALLOWED_EXTENSIONS = {".mp4", ".mov", ".avi"}
+
+STAGES = ("extract", "transcribe", "render")
+
+# Domyślne limity współbieżności dla etapów.
+# Render jest najcięższy (CPU), transkrypcja to głównie czekanie na zewnętrzny serwis.
+DEFAULT_CONCURRENCY = {"extract": 2, "transcribe": 4, "render": 1}
+
+
+def make_item(item_id: str, video_path: Path, audio_path: Path, srt_path: Path, output_path: Path) -> Dict[str, Any]:
+    """Tworzy wpis klipu do manifestu"""
+    return {
+        "id": item_id,
+        "video": str(video_path),
+        "audio": str(audio_path),
+        "srt": str(srt_path),
+        "output": str(output_path),
+        "status": "pending",
+        "error": None,
+        # Uzupełniane przez etap extract - klucze muszą istnieć od początku,
+        # bo manifest jest serializowany równolegle z pracą wątków
+        "audio_bytes": None,
+        "audio_bytes_saved": None,
+        "stages": {stage: {"status": "pending", "seconds": None} for stage in STAGES},
+    }
+
+
+def new_manifest(items: List[Dict[str, Any]], styles: dict, language: Optional[str] = None,
+                 batch_id: Optional[str] = None) -> Dict[str, Any]:
+    """Tworzy nowy manifest partii"""
+    return {
+        "batch_id": batch_id or str(uuid.uuid4()),
+        "created_at": datetime.now().isoformat(),
+        "status": "pending",
+        "styles": styles,
+        "language": language,
+        "items": items,
+        "report": None,
+    }
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path: Path, manifest: Dict[str, Any]):
+    """Zapisuje manifest atomowo (plik tymczasowy + rename)"""
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _stage_output(item: Dict[str, Any], stage: str) -> Path:
+    return Path(item[{"extract": "audio", "transcribe": "srt", "render": "output"}[stage]])
+
+
+def _stage_done(item: Dict[str, Any], stage: str) -> bool:
+    """Czy etap można pominąć.
+
+    Audio i SRT istniejące przed uruchomieniem partii (np. audio z /api/upload,
+    SRT poprawiony w edytorze) są używane ponownie. Etap przerwany w trakcie
+    ("running") jest zawsze powtarzany, bo plik może być niekompletny.
+    Render liczy się tylko, gdy ukończyła go ta partia (style mogły się zmienić).
+    """
+    status = item["stages"][stage]["status"]
+    if not _stage_output(item, stage).exists():
+        return False
+    if status in ("done", "skipped"):
+        return True
+    return stage != "render" and status == "pending"
+
+
+def _run_extract(item: Dict[str, Any], manifest: Dict[str, Any]):
+    audio_path = Path(item["audio"])
+    audio_path.parent.mkdir(parents=True, exist_ok=True)
+    audio_info, error_msg = prepare_audio(Path(item["video"]), audio_path)
+    if audio_info is None:
+        raise Exception(f"Błąd wyodrębniania audio: {error_msg}")
+    # Rozszerzenie zależy od wybranego kodeka
+    item["audio"] = str(audio_info["path"])
+    item["audio_bytes"] = audio_info["bytes"]
+    item["audio_bytes_saved"] = audio_info["bytes_saved"]
+
+
+def _run_transcribe(item: Dict[str, Any], manifest: Dict[str, Any]):
+    result = transcribe_audio(Path(item["audio"]), manifest.get("language"))
+    srt_content = result.get('srt') if isinstance(result, dict) else None
+    if not srt_content:
+        srt_content = generate_srt(result['segments'])
+    srt_path = Path(item["srt"])
+    srt_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        f.write(srt_content)
+
+
+def _run_render(item: Dict[str, Any], manifest: Dict[str, Any]):
+    output_path = Path(item["output"])
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    render_full_video(Path(item["video"]), Path(item["srt"]), output_path, manifest.get("styles") or {})
+
+
+STAGE_RUNNERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {
+    "extract": _run_extract,
+    "transcribe": _run_transcribe,
+    "render": _run_render,
+}
+
+
+def build_report(manifest: Dict[str, Any], completed: List[Dict[str, Any]],
+                 stage_seconds: Dict[str, float], wall_seconds: float) -> Dict[str, Any]:
+    """Zbiorczy raport przepustowości partii.
+
+    Czasy i przepustowość liczone są tylko dla pracy wykonanej w tym uruchomieniu
+    (przy wznowieniu pominięte etapy nie zawyżają wyników).
+    """
+    items = manifest["items"]
+    stage_seconds = {stage: round(stage_seconds.get(stage, 0), 2) for stage in STAGES}
+    input_bytes = sum(os.path.getsize(i["video"]) for i in completed if os.path.exists(i["video"]))
+    return {
+        "clips_total": len(items),
+        "clips_done": sum(1 for i in items if i["status"] == "done"),
+        "clips_failed": sum(1 for i in items if i["status"] == "failed"),
+        "clips_processed": len(completed),
+        "wall_seconds": round(wall_seconds, 2),
+        "stage_seconds": stage_seconds,
+        # >1 oznacza, że etapy się nakładały (suma czasu etapów > czas rzeczywisty)
+        "overlap_factor": round(sum(stage_seconds.values()) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "clips_per_minute": round(len(completed) / wall_seconds * 60, 2) if wall_seconds > 0 else None,
+        "input_mb_per_second": round(input_bytes / 1024 / 1024 / wall_seconds, 2) if wall_seconds > 0 else None,
+        "audio_bytes_saved": sum(i.get("audio_bytes_saved") or 0 for i in completed),
+    }
+
+
+def run_batch(manifest: Dict[str, Any], manifest_path: Path,
+              concurrency: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Uruchamia (lub wznawia) partię opisaną manifestem.
+
+    Args:
+        manifest: Manifest partii (new_manifest / load_manifest)
+        manifest_path: Gdzie zapisywać postęp
+        concurrency: Limity współbieżności per etap (domyślnie DEFAULT_CONCURRENCY)
+
+    Returns:
+        dict: Raport przepustowości (zapisany też w manifeście pod "report")
+    """
+    limits = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+    semaphores = {stage: threading.BoundedSemaphore(max(1, int(limits[stage]))) for stage in STAGES}
+    manifest_lock = threading.Lock()
+    completed = []
+    stage_seconds = {stage: 0.0 for stage in STAGES}
+
+    def checkpoint():
+        with manifest_lock:
+            save_manifest(manifest_path, manifest)
+
+    def process(item: Dict[str, Any]):
+        if item["status"] == "done" and _stage_done(item, "render"):
+            return
+        item["status"] = "running"
+        item["error"] = None
+        for stage in STAGES:
+            stage_state = item["stages"][stage]
+            if _stage_done(item, stage):
+                if stage_state["status"] == "pending":
+                    stage_state["status"] = "skipped"
+                continue
+            with semaphores[stage]:
+                stage_state["status"] = "running"
+                checkpoint()
+                started = time.monotonic()
+                try:
+                    STAGE_RUNNERS[stage](item, manifest)
+                except Exception as e:
+                    logger.error(f"[batch {manifest['batch_id']}] {item['id']}: etap {stage} nieudany: {e}")
+                    stage_state["status"] = "failed"
+                    stage_state["seconds"] = round(time.monotonic() - started, 2)
+                    item["status"] = "failed"
+                    item["error"] = f"{stage}: {str(e)}"
+                    checkpoint()
+                    return
+                stage_state["status"] = "done"
+                stage_state["seconds"] = round(time.monotonic() - started, 2)
+                with manifest_lock:
+                    stage_seconds[stage] += stage_state["seconds"]
+            logger.info(f"[batch {manifest['batch_id']}] {item['id']}: {stage} OK ({stage_state['seconds']}s)")
+        item["status"] = "done"
+        with manifest_lock:
+            completed.append(item)
+        checkpoint()
+
+    logger.info(f"=== BATCH {manifest['batch_id']}: {len(manifest['items'])} klipów, limity {limits} ===")
+    manifest["status"] = "running"
+    checkpoint()
+
+    started = time.monotonic()
+    # Klipy zgłaszane w kolejności; semafory etapów decydują o faktycznym nakładaniu się pracy
+    with ThreadPoolExecutor(max_workers=sum(max(1, int(limits[s])) for s in STAGES)) as pool:
+        list(pool.map(process, manifest["items"]))
+    wall_seconds = time.monotonic() - started
+
+    report = build_report(manifest, completed, stage_seconds, wall_seconds)
+    manifest["report"] = report
+    manifest["status"] = "failed" if report["clips_failed"] else "done"
+    checkpoint()
+    logger.info(f"=== BATCH {manifest['batch_id']} zakończony: {report} ===")
+    return report
+
+
+def collect_inputs(paths: List[str]) -> List[Path]:
+    """Rozwija katalogi do listy plików wideo (posortowanej)"""
+    videos = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            videos.extend(sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in ALLOWED_EXTENSIONS))
+        elif path.is_file() and path.suffix.lower() in ALLOWED_EXTENSIONS:
+            videos.append(path)
+        else:
+            logger.warning(f"Pomijam {path}: brak pliku lub nieobsługiwany format")
+    # Ten sam plik podany wprost i przez katalog przetwarzamy raz
+    unique = {}
+    for video in videos:
+        unique.setdefault(video.resolve(), video)
+    return list(unique.values())
+
+
+def items_for_directory(videos: List[Path], output_dir: Path) -> List[Dict[str, Any]]:
+    """Buduje wpisy manifestu dla CLI - wyniki obok siebie w output_dir"""
+    items = []
+    used_ids = set()
+    for video in videos:
+        item_id = video.stem
+        n = 1
+        while item_id in used_ids:
+            n += 1
+            item_id = f"{video.stem}_{n}"
+        used_ids.add(item_id)
+        items.append(make_item(
+            item_id,
+            video.resolve(),
+            output_dir / "audio" / f"{item_id}.mp3",
+            output_dir / f"{item_id}.srt",
+            output_dir / f"{item_id}_subtitled.mp4",
+        ))
+    return items
+
+
+def _load_styles(value: Optional[str]) -> dict:
+    """Style jako ścieżka do pliku JSON albo JSON wprost"""
+    if not value:
+        return {}
+    if os.path.isfile(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.batch", description="Wsadowe generowanie napisów dla wielu klipów")
+    parser.add_argument("inputs", nargs="*", help="Pliki wideo lub katalogi z klipami")
+    parser.add_argument("--output-dir", default="output/batch", help="Katalog wynikowy (domyślnie output/batch)")
+    parser.add_argument("--styles", help="Style napisów: plik JSON lub JSON wprost (jak subtitle_styles w API)")
+    parser.add_argument("--language", help="Język transkrypcji (domyślnie jak w API)")
+    parser.add_argument("--manifest", help="Ścieżka manifestu (domyślnie <output-dir>/manifest.json)")
+    parser.add_argument("--resume", action="store_true", help="Wznów partię z istniejącego manifestu")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage}-workers", type=int, default=DEFAULT_CONCURRENCY[stage],
+                            help=f"Limit współbieżności etapu {stage} (domyślnie {DEFAULT_CONCURRENCY[stage]})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    output_dir = Path(args.output_dir)
+    manifest_path = Path(args.manifest) if args.manifest else output_dir / "manifest.json"
+
+    if args.resume:
+        if not manifest_path.exists():
+            parser.error(f"Manifest {manifest_path} nie istnieje")
+        manifest = load_manifest(manifest_path)
+    else:
+        videos = collect_inputs(args.inputs)
+        if not videos:
+            parser.error("Brak plików wideo do przetworzenia")
+        manifest = new_manifest(items_for_directory(videos, output_dir), _load_styles(args.styles), args.language)
+
+    concurrency = {stage: getattr(args, f"{stage}_workers") for stage in STAGES}
+    report = run_batch(manifest, manifest_path, concurrency)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"Manifest: {manifest_path}")
+    return 1 if report["clips_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from typing import Optional, Dict, Any
 import os
@@ -11,10 +11,13 @@ from datetime import datetime
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import json
+import math
 import re
-import subprocess
 import logging
-from app.transcription import transcribe_audio, extract_audio, generate_srt, detect_language
+from app.transcription import transcribe_audio, prepare_audio, find_audio_file, generate_srt, detect_language, backend_status, AUDIO_SUFFIXES
+from app.rendering import render_video_segment, render_full_video, render_multi_output, RENDITIONS, RENDITION_OVERRIDES, X264_PRESETS
+from app.batch import make_item, new_manifest, load_manifest, save_manifest, run_batch, STAGES
+from app.timeline import build_timeline
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -39,9 +42,11 @@ UPLOAD_DIR = BASE_DIR / "uploads"
 AUDIO_DIR = UPLOAD_DIR / "audio"  # Nowy folder na wyodrębnione audio
 TEMP_DIR = BASE_DIR / "temp"
 OUTPUT_DIR = BASE_DIR / "output"
+BATCH_DIR = OUTPUT_DIR / "batches"  # Manifesty przetwarzania wsadowego
+TIMELINE_DIR = OUTPUT_DIR / "timeline"  # Peaks audio i miniatury dla edytora
 
 # Tworzenie folderów jeśli nie istnieją
-for dir in [UPLOAD_DIR, AUDIO_DIR, TEMP_DIR, OUTPUT_DIR]:
+for dir in [UPLOAD_DIR, AUDIO_DIR, TEMP_DIR, OUTPUT_DIR, BATCH_DIR, TIMELINE_DIR]:
     dir.mkdir(exist_ok=True)
 
 # Mount uploads directory
@@ -54,6 +59,15 @@ MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
 # Executor dla operacji blokujących - ograniczony do 4 workerów
 executor = ThreadPoolExecutor(max_workers=4)
 
+# Osobny executor dla partii - run_batch sam zarządza współbieżnością etapów
+batch_executor = ThreadPoolExecutor(max_workers=2)
+running_batches = set()
+
+# Generowanie osi czasu w tle (video_id -> Future) - osobny executor,
+# żeby dekodowanie wideo po uploadzie nie blokowało transkrypcji i renderów
+timeline_executor = ThreadPoolExecutor(max_workers=1)
+timeline_jobs = {}
+
 @app.get("/")
 async def root():
     return {
@@ -67,6 +81,12 @@ async def root():
             "upload_srt": "POST /api/upload-srt/{video_id}",
             "render_preview": "POST /api/render-preview/{video_id}",
             "render_final": "POST /api/render-final/{video_id}",
+            "render_multi": "POST /api/render-multi/{video_id} (final, preview, proxy, poster, sprite in one pass)",
+            "download_rendition": "GET /api/download/rendition/{video_id}/{name}",
+            "batch": "POST /api/batch (many video_ids, shared styles, pipelined stages)",
+            "batch_status": "GET /api/batch/{batch_id}",
+            "batch_resume": "POST /api/batch/{batch_id}/resume",
+            "timeline": "GET /api/timeline/{video_id} (waveform peaks + thumbnail sprite index)",
             "cleanup": "DELETE /api/cleanup/{video_id} (removes all files)",
             "health": "GET /api/health"
         }
@@ -79,7 +99,7 @@ async def health_check():
         "timestamp": datetime.now().isoformat(),
         "services": {
             "api": "running",
-            "whisper": "not used - external service only",
+            "transcription": backend_status(),
             "ffmpeg": "ready"
         }
     }
@@ -94,7 +114,7 @@ async def upload_video(file: UploadFile = File(...)):
     # Generowanie unikalnego ID dla pliku
     video_id = str(uuid.uuid4())
     file_path = UPLOAD_DIR / f"{video_id}{file_ext}"
-    audio_path = AUDIO_DIR / f"{video_id}.mp3"  # Changed to MP3 for smaller file size
+    audio_path = AUDIO_DIR / f"{video_id}.mp3"  # Rozszerzenie dobiera prepare_audio (.mp3/.ogg/.m4a)
 
     # Zapis pliku z walidacją rozmiaru podczas zapisu
     try:
@@ -118,10 +138,10 @@ async def upload_video(file: UploadFile = File(...)):
 
     # NOWE: Wyodrębnij audio natychmiast po upload
     try:
-        success, error_msg = await asyncio.get_event_loop().run_in_executor(
-            executor, extract_audio, file_path, audio_path
+        audio_info, error_msg = await asyncio.get_event_loop().run_in_executor(
+            executor, prepare_audio, file_path, audio_path
         )
-        if not success:
+        if audio_info is None:
             # Jeśli wyodrębnianie audio się nie powiedzie, usuń video i zwróć błąd
             if file_path.exists():
                 os.remove(file_path)
@@ -134,12 +154,23 @@ async def upload_video(file: UploadFile = File(...)):
             os.remove(file_path)
         raise HTTPException(500, f"Błąd wyodrębniania audio: {str(e)}")
 
+    # Oś czasu dla edytora liczona w tle - nie opóźnia odpowiedzi
+    start_timeline(video_id, file_path, audio_info["path"], audio_info["duration"])
+
     return {
         "video_id": video_id,
         "filename": file.filename,
         "size_mb": round(file_size / 1024 / 1024, 2),
         "format": file_ext,
-        "audio_extracted": True  # Informacja że audio jest już gotowe
+        "audio_extracted": True,  # Informacja że audio jest już gotowe
+        "timeline_url": f"/api/timeline/{video_id}",
+        "audio": {
+            "mode": audio_info["mode"],
+            "codec": audio_info["codec"],
+            "bitrate_kbps": audio_info["bitrate_k"],
+            "size_mb": round(audio_info["bytes"] / 1024 / 1024, 2),
+            "bytes_saved": audio_info["bytes_saved"]
+        }
     }
 
 @app.post("/api/transcribe/{video_id}")
@@ -152,11 +183,11 @@ async def transcribe_video(
         raise HTTPException(404, "Nie znaleziono pliku wideo")
 
     # NOWE: Użyj pre-wyodrębnionego audio
-    audio_path = AUDIO_DIR / f"{video_id}.mp3"  # Changed to MP3 format
+    audio_path = find_audio_file(AUDIO_DIR / video_id)
     srt_path = OUTPUT_DIR / f"{video_id}.srt"
 
     # Sprawdź czy audio istnieje
-    if not audio_path.exists():
+    if not audio_path:
         raise HTTPException(404, "Nie znaleziono wyodrębnionego pliku audio. Spróbuj ponownie przesłać wideo.")
 
     try:
@@ -319,6 +350,138 @@ async def render_final_video(
         logger.error(f"Błąd renderowania: {e}")
         raise HTTPException(500, f"Błąd renderowania: {str(e)}")
 
+def parse_override(name: str, key: str, value: Any) -> Any:
+    """Waliduje i normalizuje jedno ustawienie wersji (typ i zakres z RENDITION_OVERRIDES)"""
+    cast, minimum, maximum = RENDITION_OVERRIDES[key]
+    # Brak wartości = domyślne zachowanie (oryginalny rozmiar, odstęp z długości filmu)
+    if value is None and key in ("height", "width", "interval"):
+        return None
+    if cast is bool:
+        if not isinstance(value, bool):
+            raise HTTPException(400, f"{name}.{key} musi być wartością true/false")
+        return value
+    if cast is str:
+        if key == "preset" and value not in X264_PRESETS:
+            raise HTTPException(400, f"{name}.preset musi być jednym z: {', '.join(X264_PRESETS)}")
+        if key == "audio_bitrate" and not (isinstance(value, str) and re.fullmatch(r"\d{2,3}k", value)):
+            raise HTTPException(400, f"{name}.audio_bitrate musi mieć postać np. 96k")
+        return value
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError
+        if cast is int:
+            if number != int(number):
+                raise ValueError
+            number = int(number)
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(400, f"{name}.{key} musi być liczbą{' całkowitą' if cast is int else ''}")
+    if number < minimum or (maximum is not None and number > maximum):
+        limit = f"{minimum}-{maximum}" if maximum is not None else f">= {minimum}"
+        raise HTTPException(400, f"{name}.{key} poza zakresem ({limit})")
+    return number
+
+def parse_renditions(names: Any, overrides: Any) -> Dict[str, Dict[str, Any]]:
+    """Waliduje listę wersji i nadpisania z żądania (nazwa wersji -> ustawienia)"""
+    if names is None or names == []:
+        names = ["final", "proxy", "poster"]
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise HTTPException(400, "renditions musi być niepustą listą nazw wersji")
+    unknown = [name for name in names if name not in RENDITIONS]
+    if unknown:
+        raise HTTPException(400, f"Nieznane wersje: {', '.join(unknown)}")
+
+    if overrides is None:
+        overrides = {}
+    if not isinstance(overrides, dict):
+        raise HTTPException(400, "overrides musi być obiektem {wersja: {ustawienie: wartość}}")
+    unknown = [name for name in overrides if name not in RENDITIONS]
+    if unknown:
+        raise HTTPException(400, f"Nieznane wersje w overrides: {', '.join(unknown)}")
+
+    renditions = {}
+    for name in dict.fromkeys(names):
+        settings = overrides.get(name) or {}
+        if not isinstance(settings, dict):
+            raise HTTPException(400, f"overrides.{name} musi być obiektem")
+        unknown_keys = [key for key in settings if key not in RENDITION_OVERRIDES]
+        if unknown_keys:
+            raise HTTPException(400, f"Nieznane ustawienia {name}: {', '.join(unknown_keys)}")
+        renditions[name] = {key: parse_override(name, key, value) for key, value in settings.items()}
+    return renditions
+
+@app.post("/api/render-multi/{video_id}")
+async def render_multi(
+    video_id: str,
+    request_data: Dict[str, Any] = Body(...)
+):
+    """Renderuje kilka wersji (np. pełny film, proxy, miniatura) z jednego dekodowania źródła"""
+    try:
+        logger.info(f"=== RENDER MULTI REQUEST ===")
+        logger.info(f"Video ID: {video_id}")
+        logger.info(f"Raw request data: {request_data}")
+
+        subtitle_styles = request_data.get('subtitle_styles', {})
+        renditions = parse_renditions(request_data.get('renditions'), request_data.get('overrides'))
+
+        # Znajdź pliki
+        video_path = find_video_file(video_id)
+        if not video_path:
+            raise HTTPException(404, "Nie znaleziono pliku wideo")
+        srt_path = OUTPUT_DIR / f"{video_id}.srt"
+
+        if not srt_path.exists():
+            raise HTTPException(404, "Plik SRT nie istnieje")
+
+        outputs = [
+            {**RENDITIONS[name], **settings, "path": rendition_path(video_id, name)}
+            for name, settings in renditions.items()
+        ]
+
+        resolved = await asyncio.get_event_loop().run_in_executor(
+            executor,
+            render_multi_output,
+            video_path,
+            srt_path,
+            outputs,
+            subtitle_styles
+        )
+
+        return {
+            "video_id": video_id,
+            "renditions": {
+                name: {
+                    "file": rendition_path(video_id, name).name,
+                    "download_url": f"/api/download/rendition/{video_id}/{name}",
+                    # Rozstrzygnięte ustawienia, np. interval i rozmiar kafelków sprite
+                    **{k: v for k, v in settings.items() if k != "path"}
+                }
+                for name, settings in zip(renditions, resolved)
+            },
+            "message": "Wersje zostały wygenerowane pomyślnie"
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Błąd renderowania wielu wersji: {e}")
+        raise HTTPException(500, f"Błąd renderowania: {str(e)}")
+
+@app.get("/api/download/rendition/{video_id}/{name}")
+async def download_rendition(video_id: str, name: str):
+    if name not in RENDITIONS:
+        raise HTTPException(404, "Nieznana wersja")
+    path = rendition_path(video_id, name)
+    if not path.exists():
+        raise HTTPException(404, "Plik nie istnieje")
+    return FileResponse(
+        path,
+        media_type="video/mp4" if path.suffix == ".mp4" else "image/jpeg",
+        filename=f"{name}_{video_id}{path.suffix}"
+    )
+
 @app.get("/api/download/video/{video_id}")
 async def download_final_video(video_id: str):
     video_path = OUTPUT_DIR / f"{video_id}_subtitled.mp4"
@@ -330,6 +493,157 @@ async def download_final_video(video_id: str):
         filename=f"video_with_subtitles_{video_id}.mp4"
     )
 
+def parse_concurrency(value: Any) -> Optional[Dict[str, int]]:
+    """Waliduje limity współbieżności z żądania (znane etapy, dodatnie liczby całkowite)"""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise HTTPException(400, "concurrency musi być obiektem {etap: limit}")
+    unknown = [stage for stage in value if stage not in STAGES]
+    if unknown:
+        raise HTTPException(400, f"Nieznane etapy w concurrency: {', '.join(unknown)}")
+    for stage, limit in value.items():
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise HTTPException(400, f"Limit etapu {stage} musi być dodatnią liczbą całkowitą")
+    return value
+
+def start_batch(manifest: Dict[str, Any], concurrency: Optional[Dict[str, int]] = None):
+    """Uruchamia partię w tle"""
+    batch_id = manifest["batch_id"]
+    running_batches.add(batch_id)
+
+    def run():
+        try:
+            run_batch(manifest, BATCH_DIR / f"{batch_id}.json", concurrency)
+        except Exception as e:
+            logger.error(f"Błąd partii {batch_id}: {e}")
+        finally:
+            running_batches.discard(batch_id)
+
+    batch_executor.submit(run)
+
+@app.post("/api/batch")
+async def create_batch(request_data: Dict[str, Any] = Body(...)):
+    """Przetwarza wiele przesłanych filmów ze wspólnymi stylami (transkrypcja + render)"""
+    video_ids = request_data.get('video_ids') or []
+    if not isinstance(video_ids, list) or not all(isinstance(v, str) for v in video_ids):
+        raise HTTPException(400, "video_ids musi być listą identyfikatorów")
+    # Powtórzone ID zapisywałyby równolegle te same pliki
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        raise HTTPException(400, "Brak video_ids")
+    concurrency = parse_concurrency(request_data.get('concurrency'))
+
+    items = []
+    for video_id in video_ids:
+        video_path = find_video_file(video_id)
+        if not video_path:
+            raise HTTPException(404, f"Nie znaleziono pliku wideo: {video_id}")
+        items.append(make_item(
+            video_id,
+            video_path,
+            find_audio_file(AUDIO_DIR / video_id) or AUDIO_DIR / f"{video_id}.mp3",
+            OUTPUT_DIR / f"{video_id}.srt",
+            OUTPUT_DIR / f"{video_id}_subtitled.mp4",
+        ))
+
+    manifest = new_manifest(items, request_data.get('subtitle_styles', {}), request_data.get('language'))
+    save_manifest(BATCH_DIR / f"{manifest['batch_id']}.json", manifest)
+    start_batch(manifest, concurrency)
+
+    return {
+        "batch_id": manifest["batch_id"],
+        "clips": len(items),
+        "status_url": f"/api/batch/{manifest['batch_id']}"
+    }
+
+@app.get("/api/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    """Zwraca manifest partii (stan klipów i raport przepustowości)"""
+    manifest_path = BATCH_DIR / f"{batch_id}.json"
+    if not manifest_path.exists():
+        raise HTTPException(404, "Partia nie istnieje")
+    manifest = load_manifest(manifest_path)
+    manifest["active"] = batch_id in running_batches
+    return manifest
+
+@app.post("/api/batch/{batch_id}/resume")
+async def resume_batch(batch_id: str, request_data: Dict[str, Any] = Body(default={})):
+    """Wznawia przerwaną lub częściowo nieudaną partię"""
+    manifest_path = BATCH_DIR / f"{batch_id}.json"
+    if not manifest_path.exists():
+        raise HTTPException(404, "Partia nie istnieje")
+    if batch_id in running_batches:
+        raise HTTPException(409, "Partia jest w trakcie przetwarzania")
+    concurrency = parse_concurrency(request_data.get('concurrency'))
+    start_batch(load_manifest(manifest_path), concurrency)
+    return {
+        "batch_id": batch_id,
+        "status_url": f"/api/batch/{batch_id}"
+    }
+
+def start_timeline(video_id: str, video_path: Path, audio_path: Path, duration: Optional[float] = None):
+    """Uruchamia generowanie osi czasu w tle (jeśli jeszcze nie trwa)"""
+    job = timeline_jobs.get(video_id)
+    if job and not job.done():
+        return
+    job = timeline_executor.submit(build_timeline, video_path, audio_path, TIMELINE_DIR, video_id, duration)
+    timeline_jobs[video_id] = job
+
+    def forget(finished):
+        # Po zapisaniu indeksu wystarczy plik; nieudane zadania zostają, by GET zwrócił błąd
+        if finished.exception() is None and timeline_jobs.get(video_id) is finished:
+            timeline_jobs.pop(video_id, None)
+
+    job.add_done_callback(forget)
+
+@app.get("/api/timeline/{video_id}")
+async def get_timeline(video_id: str):
+    """Indeks osi czasu (peaks + pasek miniatur); 202 gdy jeszcze się generuje"""
+    index_path = TIMELINE_DIR / f"{video_id}.json"
+    if index_path.exists():
+        return FileResponse(index_path, media_type="application/json")
+
+    video_path = find_video_file(video_id)
+    if not video_path:
+        raise HTTPException(404, "Nie znaleziono pliku wideo")
+
+    job = timeline_jobs.get(video_id)
+    if job and job.done() and job.exception():
+        timeline_jobs.pop(video_id, None)
+        raise HTTPException(500, f"Błąd generowania osi czasu: {job.exception()}")
+
+    if not job:
+        # Wideo przesłane przed wprowadzeniem osi czasu - wygeneruj na żądanie
+        audio_path = find_audio_file(AUDIO_DIR / video_id)
+        if not audio_path:
+            raise HTTPException(404, "Nie znaleziono wyodrębnionego pliku audio. Spróbuj ponownie przesłać wideo.")
+        start_timeline(video_id, video_path, audio_path)
+
+    return JSONResponse({"video_id": video_id, "status": "processing"}, status_code=202)
+
+@app.get("/api/timeline/{video_id}/peaks")
+async def get_timeline_peaks(video_id: str):
+    peaks_path = TIMELINE_DIR / f"{video_id}_peaks.bin"
+    if not peaks_path.exists():
+        raise HTTPException(404, "Dane przebiegu audio nie istnieją")
+    return FileResponse(
+        peaks_path,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+@app.get("/api/timeline/{video_id}/sprite")
+async def get_timeline_sprite(video_id: str):
+    sprite_path = TIMELINE_DIR / f"{video_id}_sprite.jpg"
+    if not sprite_path.exists():
+        raise HTTPException(404, "Miniatury nie istnieją")
+    return FileResponse(
+        sprite_path,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
 @app.delete("/api/cleanup/{video_id}")
 async def cleanup_video_files(video_id: str):
     """Usuwa wszystkie pliki związane z danym video_id"""
@@ -343,8 +657,8 @@ async def cleanup_video_files(video_id: str):
                 video_file.unlink()
                 deleted_files.append(f"video: {video_file.name}")
         
-        # Usuń plik audio (both .wav and .mp3 for backward compatibility)
-        for ext in ['.mp3', '.wav']:
+        # Usuń plik audio (wszystkie obsługiwane rozszerzenia, w tym dawne .wav)
+        for ext in AUDIO_SUFFIXES:
             audio_file = AUDIO_DIR / f"{video_id}{ext}"
             if audio_file.exists():
                 audio_file.unlink()
@@ -367,6 +681,26 @@ async def cleanup_video_files(video_id: str):
         if preview_file.exists():
             preview_file.unlink()
             deleted_files.append(f"preview: {preview_file.name}")
+
+        # Usuń dane osi czasu; zadanie jeszcze w kolejce jest anulowane, a trwające
+        # samo usuwa swoje pliki, gdy zauważy brak wideo (build_timeline)
+        job = timeline_jobs.pop(video_id, None)
+        if job:
+            job.cancel()
+        for name in [f"{video_id}.json", f"{video_id}_peaks.bin", f"{video_id}_sprite.jpg"]:
+            timeline_file = TIMELINE_DIR / name
+            try:
+                timeline_file.unlink()
+                deleted_files.append(f"timeline: {timeline_file.name}")
+            except FileNotFoundError:
+                pass
+
+        # Usuń pozostałe wersje (proxy, miniatura, sprite)
+        for name in RENDITIONS:
+            rendition_file = rendition_path(video_id, name)
+            if rendition_file.exists():
+                rendition_file.unlink()
+                deleted_files.append(f"{name}: {rendition_file.name}")
         
         return {
             "message": f"Usunięto {len(deleted_files)} plików",
@@ -383,111 +717,14 @@ def find_video_file(video_id: str) -> Optional[Path]:
     video_files = list(UPLOAD_DIR.glob(f"{video_id}.*"))
     return video_files[0] if video_files else None
 
-def hex_to_ass_color(hex_color: str) -> str:
-    """Konwertuje kolor hex na format ASS (BGR)"""
-    if not hex_color.startswith('#'):
-        hex_color = '#' + hex_color
-    if len(hex_color) != 7:
-        return "&H00FFFFFF&"  # default white
-
-    hex_clean = hex_color[1:]  # usuń #
-    try:
-        r = int(hex_clean[0:2], 16)
-        g = int(hex_clean[2:4], 16)
-        b = int(hex_clean[4:6], 16)
-        # ASS używa formatu &HBBGGRR&
-        return f"&H00{b:02X}{g:02X}{r:02X}&"
-    except ValueError:
-        return "&H00FFFFFF&"  # default white
-
-def render_video_with_subtitles(
-    video_path: Path,
-    srt_path: Path,
-    output_path: Path,
-    styles: dict,
-    duration: Optional[int] = None,
-    preset: str = 'medium',
-    crf: int = 20
-):
-    """Renderuje wideo z napisami - wspólna funkcja dla próbki i pełnego filmu
-
-    Args:
-        video_path: Ścieżka do pliku wideo
-        srt_path: Ścieżka do pliku SRT
-        output_path: Ścieżka wyjściowa
-        styles: Słownik ze stylami napisów
-        duration: Długość w sekundach (None = pełny film)
-        preset: Preset ffmpeg (fast/medium/slow)
-        crf: Constant Rate Factor (niższe = lepsza jakość)
-    """
-    try:
-        render_type = "PREVIEW" if duration else "FULL VIDEO"
-        logger.info(f"=== RENDER {render_type} ===")
-        logger.info(f"Received styles: {styles}")
-
-        # Wyciągnij style z właściwej struktury
-        font_family = styles.get('fontFamily', 'Arial')
-        font_size = styles.get('fontSize', 24)
-        color = styles.get('color', '#FFFFFF')
-        stroke_color = styles.get('strokeColor', '#000000')
-        stroke_width = styles.get('strokeWidth', 2)
-
-        logger.info(f"Parsed styles: Font={font_family}, Size={font_size}, Color={color}, Stroke={stroke_color}, Width={stroke_width}")
-
-        # Konwersja kolorów z hex na ASS format (BGR)
-        color_ass = hex_to_ass_color(color)
-        stroke_color_ass = hex_to_ass_color(stroke_color)
-
-        logger.info(f"Converted colors: Text={color_ass}, Stroke={stroke_color_ass}")
-
-        # Usuń stary plik jeśli istnieje
-        if output_path.exists():
-            output_path.unlink()
-
-        # Buduj komendę ffmpeg
-        cmd = [
-            'ffmpeg', '-i', str(video_path),
-            '-vf',
-            f"subtitles={srt_path}:force_style='Fontname={font_family},Fontsize={font_size},PrimaryColour={color_ass},OutlineColour={stroke_color_ass},Outline={stroke_width},Bold=0,BorderStyle=1'",
-        ]
-
-        # Dodaj ograniczenie czasu dla próbki
-        if duration:
-            cmd.extend(['-t', str(duration)])
-
-        # Dodaj parametry kodowania
-        cmd.extend([
-            '-c:v', 'libx264',
-            '-preset', preset,
-            '-crf', str(crf),
-            '-c:a', 'aac',
-            '-y', str(output_path)
-        ])
-
-        logger.info(f"FFmpeg command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            logger.error(f"FFmpeg stderr: {result.stderr}")
-            logger.error(f"FFmpeg stdout: {result.stdout}")
-            raise Exception(f"FFmpeg error: {result.stderr}")
-
-        logger.info(f"{render_type} wygenerowany pomyślnie")
-        return True
-
-    except Exception as e:
-        logger.error(f"Błąd renderowania {render_type}: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
-
-def render_video_segment(video_path: Path, srt_path: Path, output_path: Path, styles: dict, duration: int):
-    """Renderuje fragment wideo z napisami (próbka)"""
-    return render_video_with_subtitles(video_path, srt_path, output_path, styles, duration=duration, preset='fast', crf=23)
-
-def render_full_video(video_path: Path, srt_path: Path, output_path: Path, styles: dict):
-    """Renderuje pełne wideo z napisami"""
-    return render_video_with_subtitles(video_path, srt_path, output_path, styles, duration=None, preset='medium', crf=20)
+def rendition_path(video_id: str, name: str) -> Path:
+    """Ścieżka pliku danej wersji - final i preview zgodne z render-final/render-preview"""
+    if name == "final":
+        return OUTPUT_DIR / f"{video_id}_subtitled.mp4"
+    if name == "preview":
+        return TEMP_DIR / f"{video_id}_preview.mp4"
+    suffix = ".mp4" if RENDITIONS[name]["kind"] == "video" else ".jpg"
+    return OUTPUT_DIR / f"{video_id}_{name}{suffix}"
 
 if __name__ == "__main__":
     import uvicorn
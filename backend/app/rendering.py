@@ -0,0 +1,322 @@
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+import subprocess
+import logging
+import math
+
+from app.transcription import probe_media
+
+logger = logging.getLogger(__name__)
+
+# Predefiniowane wersje dla render_multi_output (nazwa -> ustawienia wyjścia)
+RENDITIONS = {
+    "final": {"kind": "video", "preset": "medium", "crf": 20},
+    "preview": {"kind": "video", "preset": "fast", "crf": 23, "duration": 10},
+    "proxy": {"kind": "video", "height": 360, "preset": "veryfast", "crf": 28, "audio_bitrate": "96k"},
+    "poster": {"kind": "poster", "time": 1, "height": 720, "subtitles": False},
+    # interval None = dobierany z długości filmu, aby cały film zmieścił się w arkuszu
+    "sprite": {"kind": "sprite", "interval": None, "columns": 10, "rows": 10, "height": 90, "subtitles": False},
+}
+# Ustawienia, które klient może nadpisać per wersja: nazwa -> (typ, minimum, maksimum)
+RENDITION_OVERRIDES = {
+    "height": (int, 16, 4320),
+    "width": (int, 16, 7680),
+    "crf": (int, 0, 51),
+    "columns": (int, 1, 50),
+    "rows": (int, 1, 50),
+    "duration": (float, 0.1, None),
+    "time": (float, 0, None),
+    "interval": (float, 0.1, None),
+    "preset": (str, None, None),
+    "audio_bitrate": (str, None, None),
+    "subtitles": (bool, None, None),
+}
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"]
+
+def sprite_interval(duration: float, columns: int, rows: int, min_interval: int = 1) -> int:
+    """Odstęp między klatkami arkusza miniatur, przy którym cały film mieści się w columns x rows"""
+    return max(min_interval, math.ceil(duration / (columns * rows)))
+
+def scale_filter(width: Optional[int], height: Optional[int]) -> Optional[str]:
+    """Filtr skalowania z zachowaniem proporcji (wymiary parzyste - wymóg libx264).
+
+    Podana tylko jedna krawędź - druga wyliczana z proporcji; obie - obraz mieści się w ramce width x height.
+    """
+    if width and height:
+        return (f"scale={int(width)}:{int(height)}:force_original_aspect_ratio=decrease"
+                f":force_divisible_by=2")
+    if width:
+        return f"scale={int(width) // 2 * 2}:-2"
+    if height:
+        return f"scale=-2:{int(height) // 2 * 2}"
+    return None
+
+def hex_to_ass_color(hex_color: str) -> str:
+    """Konwertuje kolor hex na format ASS (BGR)"""
+    if not hex_color.startswith('#'):
+        hex_color = '#' + hex_color
+    if len(hex_color) != 7:
+        return "&H00FFFFFF&"  # default white
+
+    hex_clean = hex_color[1:]  # usuń #
+    try:
+        r = int(hex_clean[0:2], 16)
+        g = int(hex_clean[2:4], 16)
+        b = int(hex_clean[4:6], 16)
+        # ASS używa formatu &HBBGGRR&
+        return f"&H00{b:02X}{g:02X}{r:02X}&"
+    except ValueError:
+        return "&H00FFFFFF&"  # default white
+
+def build_subtitles_filter(srt_path: Path, styles: dict) -> str:
+    """Buduje filtr ffmpeg 'subtitles' ze stylami napisów"""
+    # Wyciągnij style z właściwej struktury
+    font_family = styles.get('fontFamily', 'Arial')
+    font_size = styles.get('fontSize', 24)
+    color = styles.get('color', '#FFFFFF')
+    stroke_color = styles.get('strokeColor', '#000000')
+    stroke_width = styles.get('strokeWidth', 2)
+
+    logger.info(f"Parsed styles: Font={font_family}, Size={font_size}, Color={color}, Stroke={stroke_color}, Width={stroke_width}")
+
+    # Konwersja kolorów z hex na ASS format (BGR)
+    color_ass = hex_to_ass_color(color)
+    stroke_color_ass = hex_to_ass_color(stroke_color)
+
+    logger.info(f"Converted colors: Text={color_ass}, Stroke={stroke_color_ass}")
+
+    return f"subtitles={srt_path}:force_style='Fontname={font_family},Fontsize={font_size},PrimaryColour={color_ass},OutlineColour={stroke_color_ass},Outline={stroke_width},Bold=0,BorderStyle=1'"
+
+def render_video_with_subtitles(
+    video_path: Path,
+    srt_path: Path,
+    output_path: Path,
+    styles: dict,
+    duration: Optional[int] = None,
+    preset: str = 'medium',
+    crf: int = 20
+):
+    """Renderuje wideo z napisami - wspólna funkcja dla próbki i pełnego filmu
+
+    Args:
+        video_path: Ścieżka do pliku wideo
+        srt_path: Ścieżka do pliku SRT
+        output_path: Ścieżka wyjściowa
+        styles: Słownik ze stylami napisów
+        duration: Długość w sekundach (None = pełny film)
+        preset: Preset ffmpeg (fast/medium/slow)
+        crf: Constant Rate Factor (niższe = lepsza jakość)
+    """
+    try:
+        render_type = "PREVIEW" if duration else "FULL VIDEO"
+        logger.info(f"=== RENDER {render_type} ===")
+        logger.info(f"Received styles: {styles}")
+
+        # Usuń stary plik jeśli istnieje
+        if output_path.exists():
+            output_path.unlink()
+
+        # Buduj komendę ffmpeg
+        cmd = [
+            'ffmpeg', '-i', str(video_path),
+            '-vf', build_subtitles_filter(srt_path, styles),
+        ]
+
+        # Dodaj ograniczenie czasu dla próbki
+        if duration:
+            cmd.extend(['-t', str(duration)])
+
+        # Dodaj parametry kodowania
+        cmd.extend([
+            '-c:v', 'libx264',
+            '-preset', preset,
+            '-crf', str(crf),
+            '-c:a', 'aac',
+            '-y', str(output_path)
+        ])
+
+        logger.info(f"FFmpeg command: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            logger.error(f"FFmpeg stderr: {result.stderr}")
+            logger.error(f"FFmpeg stdout: {result.stdout}")
+            raise Exception(f"FFmpeg error: {result.stderr}")
+
+        logger.info(f"{render_type} wygenerowany pomyślnie")
+        return True
+
+    except Exception as e:
+        logger.error(f"Błąd renderowania {render_type}: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+def render_video_segment(video_path: Path, srt_path: Path, output_path: Path, styles: dict, duration: int):
+    """Renderuje fragment wideo z napisami (próbka)"""
+    return render_video_with_subtitles(video_path, srt_path, output_path, styles, duration=duration, preset='fast', crf=23)
+
+def render_full_video(video_path: Path, srt_path: Path, output_path: Path, styles: dict):
+    """Renderuje pełne wideo z napisami"""
+    return render_video_with_subtitles(video_path, srt_path, output_path, styles, duration=None, preset='medium', crf=20)
+
+def render_multi_output(
+    video_path: Path,
+    srt_path: Optional[Path],
+    outputs: List[Dict[str, Any]],
+    styles: Optional[dict] = None,
+    duration: Optional[float] = None,
+    keyframes_only: bool = False
+) -> List[Dict[str, Any]]:
+    """Renderuje kilka wersji wideo w jednym przebiegu ffmpeg.
+
+    Źródło jest dekodowane raz, a napisy rasteryzowane raz - obraz jest potem
+    rozdzielany filtrem split na gałęzie z własnym skalowaniem i enkoderem.
+
+    Args:
+        video_path: Ścieżka do pliku wideo
+        srt_path: Ścieżka do pliku SRT (None = bez napisów we wszystkich wyjściach)
+        outputs: Lista wyjść, każde to słownik z kluczem "kind":
+            - "video": path, height, width (None = oryginał), preset, crf, audio_bitrate, duration
+            - "poster": path, time (sekunda klatki), height, width
+            - "sprite": path, interval (co ile sekund, None = z długości filmu), columns, rows,
+              height, width (stały kafelek; domyślnie 16:9 do wysokości)
+            Każde wyjście może mieć "subtitles": False (gałąź bez napisów).
+        styles: Słownik ze stylami napisów
+        duration: Ograniczenie długości wejścia w sekundach (None = pełny film)
+        keyframes_only: Dekoduj tylko klatki kluczowe (-skip_frame nokey) - dużo taniej,
+            wystarczające dla miniatur, nie do wyjść wideo
+
+    Returns:
+        Lista rozstrzygniętych ustawień (kolejność jak outputs): dla sprite interval, columns,
+        rows, tile_width, tile_height i count (None gdy długość filmu nieznana) - indeks czasu
+        kafelków; dla poster faktyczny time; dla video width/height.
+    """
+    try:
+        logger.info(f"=== RENDER MULTI OUTPUT ({len(outputs)}) ===")
+        if not outputs:
+            raise ValueError("Brak wyjść do wyrenderowania")
+
+        with_subs = [o for o in outputs if srt_path and o.get('subtitles', True)]
+        without_subs = [o for o in outputs if not (srt_path and o.get('subtitles', True))]
+
+        # Graf: [0:v] -> (split na gałąź z napisami i bez) -> split per wyjście -> skalowanie
+        graph = []
+        branches = {}
+        sources = []
+        if with_subs:
+            sources.append(('sub', with_subs))
+        if without_subs:
+            sources.append(('raw', without_subs))
+        if len(sources) == 2:
+            graph.append("[0:v]split=2[sub_in][raw_in]")
+            inputs = {'sub': '[sub_in]', 'raw': '[raw_in]'}
+        else:
+            inputs = {sources[0][0]: '[0:v]'}
+
+        for name, group in sources:
+            chain = inputs[name]
+            if name == 'sub':
+                chain += build_subtitles_filter(srt_path, styles or {}) + ","
+            labels = [f"[{name}{i}]" for i in range(len(group))]
+            graph.append(f"{chain}split={len(group)}{''.join(labels)}")
+            for output, label in zip(group, labels):
+                branches[id(output)] = label
+
+        # Długość materiału potrzebna do doboru odstępu miniatur i ograniczenia czasu klatki plakatu
+        clip_duration = None
+        if any(o.get('kind') == 'poster' or (o.get('kind') == 'sprite' and not o.get('interval')) for o in outputs):
+            probe = probe_media(video_path)
+            clip_duration = probe.get("duration") if probe else None
+            if duration and (not clip_duration or duration < clip_duration):
+                clip_duration = float(duration)
+
+        cmd = ['ffmpeg']
+        if keyframes_only:
+            cmd.extend(['-skip_frame', 'nokey'])
+        if duration:
+            cmd.extend(['-t', str(duration)])
+        cmd.extend(['-i', str(video_path)])
+
+        output_args = []
+        resolved = []
+        for index, output in enumerate(outputs):
+            label = branches[id(output)]
+            out_label = f"[out{index}]"
+            kind = output.get('kind', 'video')
+            height = output.get('height')
+            scale = scale_filter(output.get('width'), height)
+
+            if kind == 'video':
+                graph.append(f"{label}{scale or 'null'}{out_label}")
+                args = ['-map', out_label, '-map', '0:a?']
+                if output.get('duration'):
+                    args.extend(['-t', str(output['duration'])])
+                args.extend([
+                    '-c:v', 'libx264',
+                    '-preset', output.get('preset', 'medium'),
+                    '-crf', str(output.get('crf', 20)),
+                    '-c:a', 'aac',
+                ])
+                if output.get('audio_bitrate'):
+                    args.extend(['-b:a', output['audio_bitrate']])
+                settings = {"width": output.get('width'), "height": height, "duration": output.get('duration')}
+            elif kind == 'poster':
+                time = float(output.get('time') or 0)
+                if clip_duration and time >= clip_duration:
+                    # Klip krótszy niż czas plakatu - weź klatkę ze środka zamiast pustego wyjścia
+                    time = clip_duration / 2
+                filters = [f"trim=start={time}", "setpts=PTS-STARTPTS"]
+                if scale:
+                    filters.append(scale)
+                graph.append(f"{label}{','.join(filters)}{out_label}")
+                args = ['-map', out_label, '-frames:v', '1', '-q:v', '3']
+                settings = {"time": time, "width": output.get('width'), "height": height}
+            elif kind == 'sprite':
+                columns, rows = int(output.get('columns', 10)), int(output.get('rows', 10))
+                interval = output.get('interval')
+                if not interval:
+                    interval = sprite_interval(clip_duration, columns, rows) if clip_duration else 10
+                filters = [f"fps=1/{float(interval)}"]
+                # Stały rozmiar kafelka (z czarnymi pasami) - klient indeksuje kafelki bez znajomości proporcji
+                h = int(height or 90)
+                w = int(output.get('width') or round(h * 16 / 9 / 2) * 2)
+                filters.append(f"scale={w}:{h}:force_original_aspect_ratio=decrease")
+                filters.append(f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2")
+                filters.append(f"tile={columns}x{rows}")
+                graph.append(f"{label}{','.join(filters)}{out_label}")
+                args = ['-map', out_label, '-frames:v', '1', '-q:v', '5']
+                settings = {
+                    "interval": interval,
+                    "columns": columns,
+                    "rows": rows,
+                    "tile_width": w,
+                    "tile_height": h,
+                    # Kafelek i pokazuje klatkę z czasu i * interval
+                    "count": min(columns * rows, math.ceil(clip_duration / float(interval))) if clip_duration else None,
+                }
+            else:
+                raise ValueError(f"Nieznany rodzaj wyjścia: {kind}")
+
+            output_path = Path(output['path'])
+            if output_path.exists():
+                output_path.unlink()
+            output_args.extend(args + ['-y', str(output_path)])
+            resolved.append({"kind": kind, "path": output_path, **settings})
+
+        cmd.extend(['-filter_complex', ';'.join(graph)])
+        cmd.extend(output_args)
+
+        logger.info(f"FFmpeg command: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            logger.error(f"FFmpeg stderr: {result.stderr}")
+            raise Exception(f"FFmpeg error: {result.stderr}")
+
+        logger.info("MULTI OUTPUT wygenerowany pomyślnie")
+        return resolved
+
+    except Exception as e:
+        logger.error(f"Błąd renderowania MULTI OUTPUT: {e}")
+        raise
@@ -0,0 +1,102 @@
+"""Raport czasu startu aplikacji na podstawie `python -X importtime`.
+
+Uruchamia import modułu (domyślnie app.main) w osobnym procesie, więc wynik
+nie zależy od modułów już załadowanych w bieżącym interpreterze.
+
+Użycie (z katalogu backend):
+    python -m app.startup_profile
+    python -m app.startup_profile --module app.main --top 20 --json
+"""
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Ciężkie zależności, które nie powinny być ładowane przy starcie (tylko przy użyciu)
+WATCHED_MODULES = ["openai", "httpx"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_imports(module: str = "app.main", env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Importuje moduł w nowym interpreterze z -X importtime i zbiera wyniki.
+
+    Returns:
+        dict z kluczami wall_seconds, imports (lista: module, self_us, cumulative_us, depth)
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(BACKEND_DIR),
+                            env={**os.environ, **(env or {})}, timeout=300)
+    wall_seconds = time.perf_counter() - started
+
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise Exception(f"Import {module} nieudany: {' '.join(errors)[-500:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        imports.append({
+            "module": match.group(4),
+            "self_us": int(match.group(1)),
+            "cumulative_us": int(match.group(2)),
+            # Wcięcie nazwy modułu odpowiada głębokości importu (2 spacje na poziom)
+            "depth": (len(match.group(3)) - 1) // 2,
+        })
+
+    return {"module": module, "wall_seconds": wall_seconds, "imports": imports}
+
+
+def build_report(profile: Dict[str, Any], top: int = 15) -> Dict[str, Any]:
+    imports = profile["imports"]
+    loaded = {entry["module"] for entry in imports}
+    top_level = [entry for entry in imports if entry["depth"] == 0]
+    # Bezpośrednie importy modułów najwyższego poziomu - tu widać, co spowalnia start
+    direct = [entry for entry in imports if entry["depth"] <= 1]
+    return {
+        "module": profile["module"],
+        "wall_seconds": round(profile["wall_seconds"], 3),
+        "import_seconds": round(sum(entry["cumulative_us"] for entry in top_level) / 1_000_000, 3),
+        "modules_imported": len(imports),
+        "slowest": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 1)}
+            for entry in sorted(direct, key=lambda e: e["cumulative_us"], reverse=True)[:top]
+        ],
+        "watched_loaded": [name for name in WATCHED_MODULES if name in loaded],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.startup_profile", description="Raport czasu importu przy starcie")
+    parser.add_argument("--module", default="app.main", help="Moduł do zaimportowania (domyślnie app.main)")
+    parser.add_argument("--top", type=int, default=15, help="Liczba najwolniejszych importów w raporcie")
+    parser.add_argument("--json", action="store_true", help="Wynik jako JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report(profile_imports(args.module), args.top)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Import {report['module']}: {report['import_seconds']}s "
+          f"(proces: {report['wall_seconds']}s, modułów: {report['modules_imported']})")
+    print("Najwolniejsze importy:")
+    for entry in report["slowest"]:
+        print(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    print(f"Załadowane ciężkie zależności: {', '.join(report['watched_loaded']) or 'brak'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Lekkie dane osi czasu dla edytora: szczyty przebiegu audio i pasek miniatur.
+
+Liczone raz po uploadzie i zapisywane w cache, aby przeglądarka nie musiała
+pobierać ani przewijać całego wideo, żeby narysować oś czasu.
+
+Format peaks: surowa tablica bajtów (uint8, 0-255), jeden bajt na przedział
+o długości 1/PEAKS_PER_SECOND sekundy - maksymalna amplituda w przedziale.
+"""
+from pathlib import Path
+from typing import Optional, Dict, Any
+from array import array
+from datetime import datetime
+import json
+import logging
+import math
+import subprocess
+import sys
+
+from app.rendering import render_multi_output, sprite_interval
+from app.transcription import probe_media
+
+logger = logging.getLogger(__name__)
+
+PEAKS_PER_SECOND = 50
+# Częstotliwość dekodowania audio dla peaks - 40 próbek na przedział wystarcza do obwiedni
+# mowy, a ffmpeg odrzuca resztę danych zamiast pętli w Pythonie (ok. 1 s CPU na godzinę audio)
+PEAKS_SAMPLE_RATE = 2000
+# Porcja PCM czytana z ffmpeg naraz (sekundy) - pamięć nie rośnie z długością nagrania
+PEAKS_CHUNK_SECONDS = 60
+
+# Pasek miniatur: jedna klatka co `interval` sekund, maksymalnie columns x rows kafelków
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+SPRITE_TILE_WIDTH = 160
+SPRITE_TILE_HEIGHT = 90
+SPRITE_MIN_INTERVAL = 1
+
+
+def compute_waveform_peaks(audio_path: Path, peaks_path: Path,
+                           peaks_per_second: int = PEAKS_PER_SECOND) -> int:
+    """Dekoduje audio do mono PCM 16-bit i zapisuje szczyty amplitudy jako uint8.
+
+    PCM jest czytany strumieniowo porcjami po PEAKS_CHUNK_SECONDS sekund.
+
+    Returns:
+        int: Liczba zapisanych szczytów
+    """
+    cmd = [
+        'ffmpeg', '-v', 'error', '-i', str(audio_path),
+        '-ac', '1',
+        '-ar', str(PEAKS_SAMPLE_RATE),
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-'
+    ]
+    bucket = max(1, PEAKS_SAMPLE_RATE // peaks_per_second)
+    # Porcja to wielokrotność przedziału - przedziały nie są dzielone między porcje
+    chunk_bytes = bucket * 2 * peaks_per_second * PEAKS_CHUNK_SECONDS
+    peaks = bytearray()
+
+    def add_peaks(data: bytes):
+        samples = array('h')
+        samples.frombytes(data[:len(data) - len(data) % 2])
+        if sys.byteorder != 'little':
+            samples.byteswap()
+        for start in range(0, len(samples), bucket):
+            chunk = samples[start:start + bucket]
+            peak = max(max(chunk), -min(chunk))
+            peaks.append(min(255, peak * 255 // 32767))
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        pending = b""
+        while True:
+            data = process.stdout.read(chunk_bytes - len(pending))
+            if not data:
+                break
+            pending += data
+            if len(pending) == chunk_bytes:
+                add_peaks(pending)
+                pending = b""
+        if pending:
+            add_peaks(pending)
+        stderr = process.stderr.read()
+        process.wait(timeout=300)
+    except Exception:
+        process.kill()
+        process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise Exception(f"FFmpeg error: {stderr.decode('utf-8', 'replace')[:500]}")
+
+    peaks_path.write_bytes(bytes(peaks))
+    return len(peaks)
+
+
+def _ensure_video(video_path: Path, video_id: str):
+    if not video_path.exists():
+        raise Exception(f"Wideo {video_id} zostało usunięte w trakcie generowania osi czasu")
+
+
+def build_timeline(video_path: Path, audio_path: Path, timeline_dir: Path, video_id: str,
+                   duration: Optional[float] = None) -> Dict[str, Any]:
+    """Generuje peaks, pasek miniatur i indeks JSON dla danego wideo.
+
+    Indeks ({video_id}.json) jest zapisywany na końcu - jego obecność oznacza,
+    że wszystkie dane osi czasu są gotowe. Jeśli wideo zostanie usunięte w trakcie
+    (cleanup) albo generowanie się nie powiedzie, częściowe pliki są usuwane.
+    """
+    timeline_dir.mkdir(parents=True, exist_ok=True)
+    peaks_path = timeline_dir / f"{video_id}_peaks.bin"
+    sprite_path = timeline_dir / f"{video_id}_sprite.jpg"
+    index_path = timeline_dir / f"{video_id}.json"
+
+    if not duration:
+        probe = probe_media(video_path)
+        duration = probe.get("duration") if probe else None
+    if not duration:
+        raise Exception("Nie można odczytać długości wideo")
+
+    logger.info(f"=== TIMELINE {video_id} ({duration:.1f}s) ===")
+
+    try:
+        peaks_count = compute_waveform_peaks(audio_path, peaks_path)
+        _ensure_video(video_path, video_id)
+
+        # Odstęp dobrany tak, aby cały film zmieścił się w jednym arkuszu
+        tiles = SPRITE_COLUMNS * SPRITE_ROWS
+        interval = sprite_interval(duration, SPRITE_COLUMNS, SPRITE_ROWS, SPRITE_MIN_INTERVAL)
+        render_multi_output(video_path, None, [{
+            "kind": "sprite",
+            "path": sprite_path,
+            "interval": interval,
+            "columns": SPRITE_COLUMNS,
+            "rows": SPRITE_ROWS,
+            "width": SPRITE_TILE_WIDTH,
+            "height": SPRITE_TILE_HEIGHT,
+        }], keyframes_only=True)
+
+        index = {
+            "video_id": video_id,
+            "duration": duration,
+            "created_at": datetime.now().isoformat(),
+            "peaks": {
+                "url": f"/api/timeline/{video_id}/peaks",
+                "format": "uint8",
+                "per_second": PEAKS_PER_SECOND,
+                "count": peaks_count,
+            },
+            "sprite": {
+                "url": f"/api/timeline/{video_id}/sprite",
+                "interval": interval,
+                "columns": SPRITE_COLUMNS,
+                "rows": SPRITE_ROWS,
+                "tile_width": SPRITE_TILE_WIDTH,
+                "tile_height": SPRITE_TILE_HEIGHT,
+                # Kafelek i pokazuje najbliższą klatkę kluczową sprzed czasu i * interval
+                "count": min(tiles, math.ceil(duration / interval)),
+            },
+        }
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+
+        # Sprawdzenie po ostatnim zapisie: cleanup usuwa wideo przed plikami osi czasu,
+        # więc albo usunie też te pliki, albo zobaczymy tu brak wideo i posprzątamy sami
+        _ensure_video(video_path, video_id)
+    except Exception:
+        for path in (peaks_path, sprite_path, index_path):
+            path.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Timeline {video_id}: {peaks_count} peaks, {index['sprite']['count']} miniatur")
+    return index
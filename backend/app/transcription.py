@@ -4,23 +4,83 @@ from pathlib import Path
 import subprocess
 from typing import List, Dict, Optional
 from functools import lru_cache
-from openai import OpenAI
+import importlib
+import math
 import re
+import sys
 
-# Environment variables for external transcription service
-EXTERNAL_TRANSCRIPTION_URL = os.getenv("TRANSCRIPTION_API_URL")
-EXTERNAL_TRANSCRIPTION_KEY = os.getenv("TRANSCRIPTION_API_KEY")
-EXTERNAL_TRANSCRIPTION_MODEL = os.getenv("TRANSCRIPTION_MODEL", "whisper-1")
+# Backendy transkrypcji (nazwa -> moduł z funkcją transcribe(audio_path, language)).
+# Moduły są importowane dopiero przy pierwszym użyciu, więc węzły wyłącznie renderujące
+# i testy nie ładują SDK OpenAI ani nie wymagają jego konfiguracji.
+TRANSCRIPTION_BACKENDS = {
+    "openai": "app.transcription_backends.openai_compatible",
+    "stub": "app.transcription_backends.stub",
+}
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai").lower()
 
-# Flag to determine which transcription method to use
-USE_EXTERNAL_TRANSCRIPTION = bool(EXTERNAL_TRANSCRIPTION_URL and EXTERNAL_TRANSCRIPTION_KEY)
+def env_number(name: str, default: float, allow_zero: bool = True) -> float:
+    """Nieujemna liczba ze zmiennej środowiskowej; puste = domyślna, błędna = domyślna z ostrzeżeniem.
 
-# Always use external transcription service (local Whisper removed)
-if not USE_EXTERNAL_TRANSCRIPTION:
-    raise ValueError("External transcription service not configured. Please set TRANSCRIPTION_API_URL and TRANSCRIPTION_API_KEY environment variables.")
+    Nie rzuca wyjątku - zła konfiguracja nie może blokować importu aplikacji.
+    """
+    value = (os.getenv(name) or "").strip()
+    if not value:
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not math.isfinite(number) or number < 0 or (number == 0 and not allow_zero):
+        print(f"Uwaga: nieprawidłowa wartość {name}={value!r}, używam {default}")
+        return default
+    return number
+
+# Przygotowanie audio do transkrypcji
+# Limit rozmiaru pliku w serwisie (OpenAI API: 25MB) - domyślnie z zapasem
+AUDIO_TARGET_BYTES = int(env_number("TRANSCRIPTION_MAX_AUDIO_MB", 24, allow_zero=False) * 1024 * 1024)
+# Kodek przy ponownym kodowaniu: mp3 (najszersza zgodność) lub opus (OGG, mniejsze pliki)
+AUDIO_CODEC = os.getenv("TRANSCRIPTION_AUDIO_CODEC", "mp3").lower()
+# Maksymalny bitrate kodowania w kbps (puste = domyślny dla kodeka)
+AUDIO_BITRATE_K = int(env_number("TRANSCRIPTION_AUDIO_KBPS", 0))
+
+# Dostępne bitrate (kbps, malejąco) - krótkie nagrania dostają najwyższy, długie niższy, by zmieścić się w limicie
+AUDIO_BITRATE_LADDERS = {
+    "mp3": [48, 40, 32, 24, 16],
+    "opus": [32, 24, 16, 12],
+}
+# Domyślny bitrate dla mowy (mono 16kHz)
+AUDIO_DEFAULT_BITRATE_K = {"mp3": 48, "opus": 24}
+AUDIO_ENCODER_ARGS = {
+    "mp3": ['-acodec', 'libmp3lame'],
+    "opus": ['-acodec', 'libopus', '-application', 'voip'],
+}
+AUDIO_CODEC_SUFFIXES = {"mp3": ".mp3", "opus": ".ogg"}
+# Kodeki źródła, które serwis przyjmie bez ponownego kodowania
+AUDIO_COPY_CONTAINERS = {"mp3": ".mp3", "aac": ".m4a", "opus": ".ogg", "vorbis": ".ogg"}
+AUDIO_SUFFIXES = [".mp3", ".ogg", ".m4a", ".wav"]
+# Dawny stały bitrate - punkt odniesienia dla raportu oszczędności
+LEGACY_AUDIO_BITRATE_K = 64
+
+def register_backend(name: str, module_path: str):
+    """Rejestruje dodatkowy backend transkrypcji (moduł z funkcją transcribe)"""
+    TRANSCRIPTION_BACKENDS[name] = module_path
+    get_backend.cache_clear()
+
+@lru_cache(maxsize=None)
+def get_backend(name: Optional[str] = None):
+    """Zwraca (i przy pierwszym wywołaniu importuje) moduł backendu transkrypcji"""
+    name = name or TRANSCRIPTION_BACKEND
+    if name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}'. Available: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    return importlib.import_module(TRANSCRIPTION_BACKENDS[name])
 
-print(f"Konfiguracja zewnętrznego serwisu transkrypcji: {EXTERNAL_TRANSCRIPTION_URL}")
-print(f"Model transkrypcji: {EXTERNAL_TRANSCRIPTION_MODEL}")
+def backend_status() -> Dict:
+    """Stan backendów bez ich ładowania (do /api/health)"""
+    return {
+        "active": TRANSCRIPTION_BACKEND,
+        "available": list(TRANSCRIPTION_BACKENDS),
+        "loaded": [name for name, module in TRANSCRIPTION_BACKENDS.items() if module in sys.modules],
+    }
 
 def format_timestamp(seconds: float) -> str:
     hours = int(seconds // 3600)
@@ -49,106 +109,184 @@ def generate_srt(segments: List[Dict]) -> str:
     
     return "\n".join(srt_content)
 
-def extract_audio(video_path: Path, audio_path: Path) -> tuple[bool, str]:
-    """Extract audio from video file.
+def probe_media(media_path: Path) -> Optional[Dict]:
+    """Odczytuje czas trwania i parametry pierwszej ścieżki audio przez ffprobe.
 
     Returns:
-        tuple: (success: bool, error_message: str)
+        dict z kluczami duration, codec, bit_rate, sample_rate, channels
+        (None gdy ffprobe jest niedostępny lub plik jest nieczytelny)
     """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-print_format', 'json',
+        '-show_format', '-show_streams',
+        '-select_streams', 'a:0',
+        str(media_path)
+    ]
     try:
-        # Use MP3 format to reduce file size (OpenAI API limit: 25MB)
-        # Convert .wav extension to .mp3 for proper format
-        audio_path_mp3 = audio_path.with_suffix('.mp3')
-
-        cmd = [
-            'ffmpeg', '-i', str(video_path),
-            '-vn',  # no video
-            '-acodec', 'libmp3lame',  # MP3 codec
-            '-ar', '16000',  # 16kHz sample rate (good for speech)
-            '-ac', '1',  # mono
-            '-b:a', '64k',  # 64kbps bitrate (improved quality)
-            '-y',  # overwrite
-            str(audio_path_mp3)
-        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            print(f"FFprobe error (code {result.returncode}): {result.stderr[:500]}")
+            return None
+        data = json.loads(result.stdout or "{}")
+    except Exception as e:
+        print(f"FFprobe niedostępny lub błąd: {e}")
+        return None
+
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    stream = streams[0] if streams else {}
+
+    def to_number(value, cast):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        "duration": to_number(fmt.get("duration") or stream.get("duration"), float),
+        "codec": stream.get("codec_name"),
+        "bit_rate": to_number(stream.get("bit_rate"), int),
+        "sample_rate": to_number(stream.get("sample_rate"), int),
+        "channels": to_number(stream.get("channels"), int),
+    }
+
+def plan_audio(probe: Optional[Dict]) -> Dict:
+    """Dobiera sposób przygotowania audio do transkrypcji.
+
+    Domyślnie kodowanie AUDIO_CODEC z najwyższym bitrate z drabinki, przy którym
+    plik o danym czasie trwania zmieści się w AUDIO_TARGET_BYTES. Kopia strumienia
+    (bez kodowania) tylko wtedy, gdy kodek źródła jest akceptowany przez serwis,
+    a jego bitrate nie przekracza wybranego bitrate kodowania - kopia nigdy nie
+    daje większego pliku niż kodowanie.
+    """
+    duration = probe.get("duration") if probe else None
+
+    codec = AUDIO_CODEC if AUDIO_CODEC in AUDIO_BITRATE_LADDERS else "mp3"
+    ladder = AUDIO_BITRATE_LADDERS[codec]
+    max_k = AUDIO_BITRATE_K or AUDIO_DEFAULT_BITRATE_K[codec]
+    if duration:
+        # Bitrate, przy którym plik zmieści się w limicie (5% zapasu na nagłówki kontenera)
+        max_k = min(max_k, AUDIO_TARGET_BYTES * 8 * 0.95 / duration / 1000)
+    fitting = [b for b in ladder if b <= max_k]
+    if fitting:
+        bitrate_k = fitting[0]
+    else:
+        bitrate_k = ladder[-1]
+        if duration:
+            print(f"Uwaga: nagranie ({duration:.0f}s) przekroczy limit {AUDIO_TARGET_BYTES} B nawet przy {bitrate_k} kbps")
+
+    if duration and probe.get("codec") in AUDIO_COPY_CONTAINERS and probe.get("bit_rate"):
+        estimated = int(probe["bit_rate"] * duration / 8)
+        if probe["bit_rate"] <= bitrate_k * 1000 and estimated <= AUDIO_TARGET_BYTES:
+            return {
+                "mode": "copy",
+                "codec": probe["codec"],
+                "suffix": AUDIO_COPY_CONTAINERS[probe["codec"]],
+                "bitrate_k": probe["bit_rate"] // 1000,
+            }
+
+    return {
+        "mode": "encode",
+        "codec": codec,
+        "suffix": AUDIO_CODEC_SUFFIXES[codec],
+        "bitrate_k": bitrate_k,
+    }
+
+def prepare_audio(video_path: Path, audio_path: Path) -> tuple[Optional[Dict], str]:
+    """Przygotowuje audio do transkrypcji (kopia strumienia lub kodowanie dopasowane do długości).
+
+    Rozszerzenie audio_path jest zastępowane właściwym dla wybranego kodeka
+    (.mp3, .ogg, .m4a) - faktyczną ścieżkę zwraca info["path"].
+
+    Returns:
+        tuple: (info: dict | None, error_message: str)
+            info zawiera path, mode, codec, bitrate_k, duration, bytes i bytes_saved
+            (oszczędność względem dawnego stałego MP3 64 kbps)
+    """
+    try:
+        probe = probe_media(video_path)
+        if probe is not None and not probe.get("codec"):
+            error_msg = "Plik wideo nie zawiera ścieżki audio"
+            print(error_msg)
+            return None, error_msg
+
+        plan = plan_audio(probe)
+        output_path = audio_path.with_suffix(plan["suffix"])
+
+        # Usuń audio z poprzedniej ekstrakcji (mogło mieć inne rozszerzenie)
+        for suffix in AUDIO_SUFFIXES:
+            stale = audio_path.with_suffix(suffix)
+            if stale.exists():
+                stale.unlink()
+
+        cmd = ['ffmpeg', '-i', str(video_path), '-vn', '-map', '0:a:0']
+        if plan["mode"] == "copy":
+            cmd.extend(['-c:a', 'copy'])
+        else:
+            cmd.extend(AUDIO_ENCODER_ARGS[plan["codec"]])
+            cmd.extend([
+                '-ar', '16000',  # 16kHz sample rate (good for speech)
+                '-ac', '1',  # mono
+                '-b:a', f"{plan['bitrate_k']}k",
+            ])
+        cmd.extend(['-y', str(output_path)])
+
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
 
         if result.returncode != 0:
             error_msg = f"FFmpeg error (code {result.returncode}): {result.stderr[:500]}"
             print(error_msg)
-            return False, error_msg
+            return None, error_msg
 
-        # Rename to original path if user expects .wav extension
-        if audio_path_mp3.exists():
-            if audio_path != audio_path_mp3:
-                audio_path_mp3.rename(audio_path.with_suffix('.mp3'))
-            return True, ""
-        else:
+        if not output_path.exists():
             error_msg = "Audio file was not created"
             print(error_msg)
-            return False, error_msg
+            return None, error_msg
+
+        duration = probe.get("duration") if probe else None
+        size = output_path.stat().st_size
+        baseline = int(duration * LEGACY_AUDIO_BITRATE_K * 1000 / 8) if duration else None
+        info = {
+            "path": output_path,
+            "mode": plan["mode"],
+            "codec": plan["codec"],
+            "bitrate_k": plan["bitrate_k"],
+            "duration": duration,
+            "bytes": size,
+            "bytes_saved": baseline - size if baseline is not None else None,
+        }
+        print(f"Audio ({plan['mode']}, {plan['codec']} {plan['bitrate_k']} kbps): {size} B, "
+              f"oszczędność vs MP3 {LEGACY_AUDIO_BITRATE_K} kbps: {info['bytes_saved']} B")
+        if size > AUDIO_TARGET_BYTES:
+            print(f"Uwaga: plik audio ({size} B) przekracza limit serwisu transkrypcji ({AUDIO_TARGET_BYTES} B)")
+        return info, ""
 
     except subprocess.TimeoutExpired:
         error_msg = "FFmpeg timed out after 5 minutes"
         print(error_msg)
-        return False, error_msg
+        return None, error_msg
     except Exception as e:
-        error_msg = f"Unexpected error in extract_audio: {str(e)}"
+        error_msg = f"Unexpected error in prepare_audio: {str(e)}"
         print(error_msg)
-        return False, error_msg
+        return None, error_msg
 
-def transcribe_audio_with_external_service(audio_path: Path, language: Optional[str] = None) -> Dict:
-    """Transcribe audio using OpenAI Python SDK client.
+def extract_audio(video_path: Path, audio_path: Path) -> tuple[bool, str]:
+    """Extract audio from video file (see prepare_audio).
 
-    Uses client.audio.transcriptions.create with response_format='srt' as requested.
-    Returns a dict with 'text' and 'srt' fields (segments not provided in SRT mode).
+    Returns:
+        tuple: (success: bool, error_message: str)
     """
-    try:
-        print(f"Rozpoczynam transkrypcję (OpenAI SDK): {audio_path}")
-        print(f"Język: {language or 'auto-detect'}")
-        print(f"Serwis: {EXTERNAL_TRANSCRIPTION_URL}")
-        print(f"Model: {EXTERNAL_TRANSCRIPTION_MODEL}")
-
-        client = OpenAI(api_key=EXTERNAL_TRANSCRIPTION_KEY, base_url=EXTERNAL_TRANSCRIPTION_URL)
-
-        with open(audio_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model=EXTERNAL_TRANSCRIPTION_MODEL,
-                file=audio_file,
-                response_format="srt",
-                language=language or "pl",
-                temperature=0.7,
-            )
-
-        # Depending on SDK/provider, result may be str, object with .text, or JSON string
-        srt_text = None
-        if isinstance(transcription, str):
-            srt_text = transcription
-        elif hasattr(transcription, "text"):
-            srt_text = transcription.text
-        else:
-            raw = str(transcription)
-            # Try parse JSON carrying {"text": "...srt..."}
-            try:
-                parsed = json.loads(raw)
-                if isinstance(parsed, dict) and "text" in parsed:
-                    srt_text = parsed["text"]
-                else:
-                    srt_text = raw
-            except Exception:
-                srt_text = raw
+    info, error_msg = prepare_audio(video_path, audio_path)
+    return info is not None, error_msg
 
-        srt_text = normalize_srt_text(srt_text)
-
-        return {
-            "text": "",           # not provided in SRT mode
-            "segments": [],         # not provided in SRT mode
-            "language": language or "pl",
-            "srt": srt_text,
-        }
-
-    except Exception as e:
-        print(f"Błąd transkrypcji zewnętrznym serwisem (SDK): {e}")
-        raise
+def find_audio_file(audio_path: Path) -> Optional[Path]:
+    """Znajduje przygotowane audio niezależnie od rozszerzenia (.mp3/.ogg/.m4a/.wav)"""
+    for suffix in AUDIO_SUFFIXES:
+        candidate = audio_path.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    return None
 
 def normalize_srt_text(srt_text: str, max_line_length: int = 38) -> str:
     """
@@ -246,9 +384,13 @@ def normalize_srt_text(srt_text: str, max_line_length: int = 38) -> str:
 
     return "\n\n".join(out_blocks) + "\n"
 
-def transcribe_audio(audio_path: Path, language: Optional[str] = None) -> Dict:
-    """Main transcription function that uses external service only"""
-    return transcribe_audio_with_external_service(audio_path, language)
+def transcribe_audio(audio_path: Path, language: Optional[str] = None, backend: Optional[str] = None) -> Dict:
+    """Main transcription function - dispatches to the configured backend (TRANSCRIPTION_BACKEND)"""
+    return get_backend(backend).transcribe(audio_path, language)
+
+def transcribe_audio_with_external_service(audio_path: Path, language: Optional[str] = None) -> Dict:
+    """Transcribe audio using the OpenAI-compatible external service"""
+    return transcribe_audio(audio_path, language, backend="openai")
 
 def detect_language(audio_path: Path) -> str:
     try:
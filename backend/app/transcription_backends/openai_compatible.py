@@ -0,0 +1,88 @@
+"""Backend transkrypcji: zewnętrzny serwis zgodny z OpenAI API (OpenAI SDK).
+
+Ładowany leniwie przez rejestr w app.transcription - SDK OpenAI importowane jest
+dopiero przy pierwszej transkrypcji, a brak konfiguracji zgłaszany w tym momencie,
+a nie przy starcie aplikacji.
+"""
+import os
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from openai import OpenAI
+
+from app.transcription import normalize_srt_text
+
+# Environment variables for external transcription service
+EXTERNAL_TRANSCRIPTION_URL = os.getenv("TRANSCRIPTION_API_URL")
+EXTERNAL_TRANSCRIPTION_KEY = os.getenv("TRANSCRIPTION_API_KEY")
+EXTERNAL_TRANSCRIPTION_MODEL = os.getenv("TRANSCRIPTION_MODEL", "whisper-1")
+
+if not (EXTERNAL_TRANSCRIPTION_URL and EXTERNAL_TRANSCRIPTION_KEY):
+    raise ValueError("External transcription service not configured. Please set TRANSCRIPTION_API_URL and TRANSCRIPTION_API_KEY environment variables.")
+
+print(f"Konfiguracja zewnętrznego serwisu transkrypcji: {EXTERNAL_TRANSCRIPTION_URL}")
+print(f"Model transkrypcji: {EXTERNAL_TRANSCRIPTION_MODEL}")
+
+_client = None
+
+def get_client() -> OpenAI:
+    """Jeden klient na proces (pula połączeń HTTP współdzielona między transkrypcjami)"""
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=EXTERNAL_TRANSCRIPTION_KEY, base_url=EXTERNAL_TRANSCRIPTION_URL)
+    return _client
+
+def transcribe(audio_path: Path, language: Optional[str] = None) -> Dict:
+    """Transcribe audio using OpenAI Python SDK client.
+
+    Uses client.audio.transcriptions.create with response_format='srt' as requested.
+    Returns a dict with 'text' and 'srt' fields (segments not provided in SRT mode).
+    """
+    try:
+        print(f"Rozpoczynam transkrypcję (OpenAI SDK): {audio_path}")
+        print(f"Język: {language or 'auto-detect'}")
+        print(f"Serwis: {EXTERNAL_TRANSCRIPTION_URL}")
+        print(f"Model: {EXTERNAL_TRANSCRIPTION_MODEL}")
+
+        client = get_client()
+
+        with open(audio_path, "rb") as audio_file:
+            transcription = client.audio.transcriptions.create(
+                model=EXTERNAL_TRANSCRIPTION_MODEL,
+                file=audio_file,
+                response_format="srt",
+                language=language or "pl",
+                temperature=0.7,
+            )
+
+        # Depending on SDK/provider, result may be str, object with .text, or JSON string
+        srt_text = None
+        if isinstance(transcription, str):
+            srt_text = transcription
+        elif hasattr(transcription, "text"):
+            srt_text = transcription.text
+        else:
+            raw = str(transcription)
+            # Try parse JSON carrying {"text": "...srt..."}
+            try:
+                parsed = json.loads(raw)
+                if isinstance(parsed, dict) and "text" in parsed:
+                    srt_text = parsed["text"]
+                else:
+                    srt_text = raw
+            except Exception:
+                srt_text = raw
+
+        srt_text = normalize_srt_text(srt_text)
+
+        return {
+            "text": "",           # not provided in SRT mode
+            "segments": [],         # not provided in SRT mode
+            "language": language or "pl",
+            "srt": srt_text,
+        }
+
+    except Exception as e:
+        print(f"Błąd transkrypcji zewnętrznym serwisem (SDK): {e}")
+        raise
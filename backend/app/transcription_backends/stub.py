@@ -0,0 +1,41 @@
+"""Backend transkrypcji: lokalna, deterministyczna atrapa do testów i benchmarków.
+
+Nie wykonuje żadnych zapytań sieciowych - generuje napisy co
+TRANSCRIPTION_STUB_CUE_SECONDS sekund na podstawie długości nagrania,
+więc ten sam plik zawsze daje ten sam wynik.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.transcription import probe_media, generate_srt, LEGACY_AUDIO_BITRATE_K, env_number
+
+# Wartość <= 0 zapętliłaby generowanie napisów - wtedy domyślne 3 s
+STUB_CUE_SECONDS = env_number("TRANSCRIPTION_STUB_CUE_SECONDS", 3, allow_zero=False)
+
+def transcribe(audio_path: Path, language: Optional[str] = None) -> Dict:
+    """Zwraca sztuczną transkrypcję w formacie zgodnym z backendem OpenAI"""
+    language = language or "pl"
+
+    probe = probe_media(audio_path)
+    duration = probe.get("duration") if probe else None
+    if not duration:
+        # Bez ffprobe - oszacowanie z rozmiaru pliku
+        duration = audio_path.stat().st_size * 8 / (LEGACY_AUDIO_BITRATE_K * 1000)
+
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + STUB_CUE_SECONDS)
+        segments.append({
+            "start": start,
+            "end": end,
+            "text": f"Napis testowy {len(segments) + 1}",
+        })
+        start = end
+
+    return {
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+        "srt": generate_srt(segments),
+    }
@@ -1,6 +1,7 @@
 import { useState, useRef, useMemo } from 'react'
 import axios from 'axios'
 import { apiPath } from '../api'
+import Timeline from './Timeline'
 
 function SubtitleEditor({ videoId, subtitleStyles, onStylesChange, onComplete }) {
     const [fontFamily, setFontFamily] = useState(subtitleStyles?.fontFamily || 'Arial')
@@ -230,6 +231,11 @@ function SubtitleEditor({ videoId, subtitleStyles, onStylesChange, onComplete })
                     onChange={handleSubtitleUpload}
                 />
 
+                <div>
+                    <label className="block text-sm font-medium mb-2 text-gray-700 dark:text-gray-300">Oś czasu</label>
+                    <Timeline videoId={videoId} />
+                </div>
+
                 <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
                     <div>
                         <label className="block text-sm font-medium mb-2 text-gray-700 dark:text-gray-300">Czcionka</label>
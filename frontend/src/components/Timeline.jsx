@@ -0,0 +1,139 @@
+import { useEffect, useRef, useState } from 'react'
+import axios from 'axios'
+import { apiPath } from '../api'
+
+const STRIP_HEIGHT = 48
+
+// Oś czasu z przebiegiem audio i paskiem miniatur - dane liczone na serwerze przy uploadzie,
+// więc nie trzeba pobierać całego wideo, żeby ją narysować.
+function Timeline({ videoId, currentTime = 0, onSeek, thumbnails = 10 }) {
+  const [index, setIndex] = useState(null)
+  const [peaks, setPeaks] = useState(null)
+  const [error, setError] = useState(null)
+  const canvasRef = useRef(null)
+
+  useEffect(() => {
+    let cancelled = false
+    let timer = null
+
+    const load = async () => {
+      try {
+        const response = await axios.get(apiPath(`/api/timeline/${videoId}`))
+        if (cancelled) return
+        if (response.status === 202) {
+          // Jeszcze się generuje - spróbuj ponownie za chwilę
+          timer = setTimeout(load, 2000)
+          return
+        }
+        const peaksResponse = await axios.get(apiPath(response.data.peaks.url), { responseType: 'arraybuffer' })
+        if (cancelled) return
+        setIndex(response.data)
+        setPeaks(new Uint8Array(peaksResponse.data))
+      } catch (err) {
+        if (cancelled) return
+        console.error('Błąd wczytywania osi czasu:', err)
+        setError(err.response?.data?.detail || err.message)
+      }
+    }
+
+    setIndex(null)
+    setPeaks(null)
+    setError(null)
+    load()
+
+    return () => {
+      cancelled = true
+      if (timer) clearTimeout(timer)
+    }
+  }, [videoId])
+
+  useEffect(() => {
+    const canvas = canvasRef.current
+    if (!canvas || !peaks) return
+
+    const width = canvas.clientWidth
+    const height = canvas.clientHeight
+    const ratio = window.devicePixelRatio || 1
+    canvas.width = width * ratio
+    canvas.height = height * ratio
+
+    const ctx = canvas.getContext('2d')
+    ctx.scale(ratio, ratio)
+    ctx.clearRect(0, 0, width, height)
+    ctx.fillStyle = '#006575'
+
+    // Jeden słupek na piksel - maksimum z przypadających na niego szczytów
+    const perPixel = peaks.length / width
+    for (let x = 0; x < width; x++) {
+      const start = Math.floor(x * perPixel)
+      const end = Math.max(start + 1, Math.floor((x + 1) * perPixel))
+      let peak = 0
+      for (let i = start; i < end && i < peaks.length; i++) {
+        if (peaks[i] > peak) peak = peaks[i]
+      }
+      const barHeight = Math.max(1, (peak / 255) * height)
+      ctx.fillRect(x, (height - barHeight) / 2, 1, barHeight)
+    }
+  }, [peaks])
+
+  if (error) {
+    return (
+      <p className="text-sm text-gray-500 dark:text-gray-400">Oś czasu niedostępna: {error}</p>
+    )
+  }
+
+  if (!index || !peaks) {
+    return (
+      <div className="h-24 rounded-lg bg-gray-100 dark:bg-gray-700 animate-pulse" />
+    )
+  }
+
+  const { duration, sprite } = index
+  const handleClick = (e) => {
+    if (!onSeek) return
+    const rect = e.currentTarget.getBoundingClientRect()
+    onSeek(((e.clientX - rect.left) / rect.width) * duration)
+  }
+
+  // Równomiernie rozłożone miniatury wybrane z arkusza, przeskalowane do wysokości paska
+  const scale = STRIP_HEIGHT / sprite.tile_height
+  const frames = Array.from({ length: Math.min(thumbnails, sprite.count) }, (_, i) => {
+    const tile = Math.min(sprite.count - 1, Math.floor((i * sprite.count) / Math.min(thumbnails, sprite.count)))
+    return {
+      tile,
+      x: (tile % sprite.columns) * sprite.tile_width * scale,
+      y: Math.floor(tile / sprite.columns) * sprite.tile_height * scale
+    }
+  })
+
+  return (
+    <div
+      className={`relative select-none rounded-lg overflow-hidden bg-gray-900 ${onSeek ? 'cursor-pointer' : ''}`}
+      onClick={handleClick}
+    >
+      <div className="flex overflow-hidden" style={{ height: STRIP_HEIGHT }}>
+        {frames.map(frame => (
+          <div
+            key={frame.tile}
+            className="flex-shrink-0"
+            style={{
+              width: sprite.tile_width * scale,
+              backgroundImage: `url(${apiPath(sprite.url)})`,
+              backgroundPosition: `-${frame.x}px -${frame.y}px`,
+              backgroundSize: `${sprite.columns * sprite.tile_width * scale}px ${sprite.rows * sprite.tile_height * scale}px`,
+              backgroundRepeat: 'no-repeat'
+            }}
+            title={`${Math.round(frame.tile * sprite.interval)}s`}
+          />
+        ))}
+      </div>
+      <canvas ref={canvasRef} className="block w-full h-12 bg-gray-100 dark:bg-gray-800" />
+      <div
+        className="absolute top-0 bottom-0 w-0.5 bg-red-500 pointer-events-none"
+        style={{ left: `${Math.min(100, (currentTime / duration) * 100)}%` }}
+      />
+    </div>
+  )
+}
+
+export default Timeline
@@ -1,12 +1,14 @@
-import { useEffect, useRef } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { Play, Pause, SkipBack, SkipForward, ChevronLeft, ChevronRight } from 'lucide-react'
 import videojs from 'video.js'
 import 'video.js/dist/video-js.css'
 import { apiPath } from '../api'
+import Timeline from './Timeline'
 
 function VideoPreview({ videoData, transcriptionData, subtitleStyles, onNext, onBack }) {
   const videoRef = useRef(null)
   const playerRef = useRef(null)
+  const [currentTime, setCurrentTime] = useState(0)
 
   useEffect(() => {
     // Inicjalizacja Video.js
@@ -48,6 +50,7 @@ function VideoPreview({ videoData, transcriptionData, subtitleStyles, onNext, on
       })
 
       playerRef.current = player
+      player.on('timeupdate', () => setCurrentTime(player.currentTime()))
 
       // Zastosuj style napisów
       const textTrackDisplay = player.el().querySelector('.vjs-text-track-display')
@@ -102,6 +105,13 @@ function VideoPreview({ videoData, transcriptionData, subtitleStyles, onNext, on
         </div>
       </div>
 
+      {/* Timeline */}
+      <Timeline
+        videoId={videoData.video_id}
+        currentTime={currentTime}
+        onSeek={(time) => playerRef.current?.currentTime(time)}
+      />
+
       {/* Subtitle Segments */}
       <div className="bg-gray-50 dark:bg-gray-700 rounded-lg p-4">
         <h3 className="font-medium text-gray-900 dark:text-white mb-3">